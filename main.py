@@ -1,10 +1,65 @@
+import argparse
 import sys
-from PyQt6.QtCore import Qt, QPoint, QPointF
-from PyQt6.QtGui import QPainter, QPen, QPixmap, QWheelEvent, QPainterPath, QTransform
-from PyQt6.QtWidgets import QApplication, QWidget, QPushButton, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QScrollArea, QSplitter, QTabWidget, QToolButton, QFileDialog
+import time
+
+# Taken before the Qt imports so --profile-startup can report them
+startup_time = time.perf_counter()
+
+from PyQt6.QtCore import Qt, QEvent, QObject, QTimer
+from PyQt6.QtWidgets import QApplication, QWidget, QPushButton, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QScrollArea, QSplitter, QTabWidget, QToolButton, QFileDialog, QComboBox, QSpinBox
 
 from src.canvas import DrawingCanvas
 
+class LazyPanel(QWidget):
+    # Placeholder whose contents are built the first time it is shown, once
+    # the event loop is running, so hidden tabs and side panels cost nothing
+    # until they are needed and do not delay the first paint
+    def __init__(self, build, layout_class=QVBoxLayout):
+        super().__init__()
+        self.build = build
+        self.panel_layout = layout_class(self)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.build is not None:
+            build, self.build = self.build, None
+            QTimer.singleShot(0, lambda: build(self.panel_layout))
+
+class StartupProfiler(QObject):
+    # Records how long each startup phase takes, up to the first paint of the canvas
+    def __init__(self):
+        super().__init__()
+        self.phases = []
+        self.last_time = startup_time
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last_time))
+        self.last_time = now
+
+    def watch_first_paint(self, widget):
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            # Filters run before the widget's handler, so paint here and
+            # consume the event to mark the phase once painting has finished
+            obj.removeEventFilter(self)
+            obj.paintEvent(event)
+            self.mark("show to first paint")
+            QTimer.singleShot(0, self.report)
+            return True
+        return False
+
+    def report(self):
+        self.mark("deferred panels")
+        total = 0.0
+        for phase, duration in self.phases:
+            total += duration
+            print(f"{phase:<24}{duration * 1000:>10.1f} ms")
+        print(f"{'total':<24}{total * 1000:>10.1f} ms")
+        QApplication.quit()
+
 class MainWindow(QWidget):
     def __init__(self):
         super().__init__()
@@ -32,13 +87,7 @@ class MainWindow(QWidget):
         top_splitter.addWidget(self.canvas)
 
         # Right panel
-        right_panel = QWidget()
-        right_layout = QVBoxLayout(right_panel)
-        right_label = QLabel("Palette / Layers")
-        right_label.setFrameStyle(QFrame.Shape.Box | QFrame.Shadow.Raised)
-        right_layout.addWidget(right_label)
-
-        # Export button
+        right_panel = LazyPanel(self.build_right_panel)
         right_panel.setMinimumWidth(120)  # Allow a minimum width
         top_splitter.addWidget(right_panel)
 
@@ -66,10 +115,12 @@ class MainWindow(QWidget):
         self.canvas.set_mode(2)
 
     def add_ribbon_tabs(self, ribbon_tabs):
-        # File Tab
-        file_tab = QWidget()
-        file_layout = QVBoxLayout(file_tab)  # Use vertical layout to stack buttons
+        # Tab contents are only built when a tab is first selected
+        ribbon_tabs.addTab(LazyPanel(self.build_file_tab), "File")
+        ribbon_tabs.addTab(LazyPanel(self.build_pencil_tab), "Pencil")
+        ribbon_tabs.addTab(LazyPanel(self.build_pen_tab), "Pen")
 
+    def build_file_tab(self, file_layout):
         open_button = QToolButton()
         open_button.setText("Open")
         open_button.clicked.connect(self.open_file)
@@ -80,23 +131,18 @@ class MainWindow(QWidget):
         save_button.clicked.connect(self.save_file)
         file_layout.addWidget(save_button)
 
-        ribbon_tabs.addTab(file_tab, "File")
-
-        # Pencil Tab
-        pencil_tab = QWidget()
-        pencil_layout = QVBoxLayout(pencil_tab)  # Use vertical layout to stack buttons
+        import_button = QToolButton()
+        import_button.setText("Import SVG")
+        import_button.clicked.connect(self.import_svg)
+        file_layout.addWidget(import_button)
 
+    def build_pencil_tab(self, pencil_layout):
         pencil_button = QToolButton()
         pencil_button.setText("Pencil")
         # Connect to a placeholder function (you can implement a pencil tool logic later)
         pencil_layout.addWidget(pencil_button)
 
-        ribbon_tabs.addTab(pencil_tab, "Pencil")
-
-        # Pen Tab
-        pen_tab = QWidget()
-        pen_layout = QVBoxLayout(pen_tab)  # Use vertical layout to stack buttons
-
+    def build_pen_tab(self, pen_layout):
         mode_1_button = QToolButton()
         mode_1_button.setText("Draw Mode")
         mode_1_button.clicked.connect(self.mode_1)
@@ -109,7 +155,35 @@ class MainWindow(QWidget):
         pen_layout.addWidget(mode_1_button)
         pen_layout.addWidget(mode_2_button)
 
-        ribbon_tabs.addTab(pen_tab, "Pen")
+        # Refit the current stroke from its raw input points
+        pen_layout.addWidget(QLabel("Sample every"))
+        sampling_spin = QSpinBox()
+        sampling_spin.setRange(1, 100)
+        sampling_spin.setValue(self.canvas.sampling_interval)
+        sampling_spin.valueChanged.connect(self.canvas.set_sampling_interval)
+        pen_layout.addWidget(sampling_spin)
+
+        refit_button = QToolButton()
+        refit_button.setText("Refit Stroke")
+        refit_button.clicked.connect(self.canvas.refitStroke)
+        pen_layout.addWidget(refit_button)
+
+        # How raw input points are kept once a stroke is fitted
+        pen_layout.addWidget(QLabel("Raw points"))
+        policy_combo = QComboBox()
+        policy_combo.addItem("Quantized", 'quantized')
+        policy_combo.addItem("Full precision", 'full')
+        policy_combo.addItem("Drop", 'drop')
+        policy_combo.setCurrentIndex(policy_combo.findData(self.canvas.raw_points_policy))
+        policy_combo.currentIndexChanged.connect(
+            lambda index: self.canvas.set_raw_points_policy(policy_combo.itemData(index))
+        )
+        pen_layout.addWidget(policy_combo)
+
+    def build_right_panel(self, right_layout):
+        right_label = QLabel("Palette / Layers")
+        right_label.setFrameStyle(QFrame.Shape.Box | QFrame.Shadow.Raised)
+        right_layout.addWidget(right_label)
 
     def add_bottom_scroll_panel(self, splitter):
         # Create a QSplitter for the bottom section
@@ -120,13 +194,7 @@ class MainWindow(QWidget):
         scroll_area.setWidgetResizable(True)
 
         # Create a widget to hold the horizontal content
-        bottom_widget = QWidget()
-        scroll_layout = QHBoxLayout(bottom_widget)
-
-        # Add some placeholder buttons to demonstrate the scrollable area
-        for i in range(1, 21):  # 20 buttons to demonstrate scrolling
-            button = QPushButton(f'Item {i}')
-            scroll_layout.addWidget(button)
+        bottom_widget = LazyPanel(self.build_bottom_items, QHBoxLayout)
 
         scroll_area.setWidget(bottom_widget)
         bottom_splitter.addWidget(scroll_area)
@@ -138,6 +206,12 @@ class MainWindow(QWidget):
         # Add the bottom section to the main splitter
         splitter.addWidget(bottom_splitter)
 
+    def build_bottom_items(self, scroll_layout):
+        # Add some placeholder buttons to demonstrate the scrollable area
+        for i in range(1, 21):  # 20 buttons to demonstrate scrolling
+            button = QPushButton(f'Item {i}')
+            scroll_layout.addWidget(button)
+
     def export_canvas(self):
         # Call the export function in the canvas widget
         self.canvas.export_canvas()
@@ -158,8 +232,36 @@ class MainWindow(QWidget):
             # Save the canvas as a file (implementation needed)
         self.canvas.saveToFile()
 
+    def import_svg(self):
+        file_name, _ = QFileDialog.getOpenFileName(self, "Import SVG", "", "SVG Files (*.svg);;All Files (*)")
+        if file_name:
+            self.canvas.importFromSvg(file_name)
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile-startup", action="store_true", help="report time to first paint by phase, then exit")
+    parser.add_argument("--record", metavar="FILE", help="record canvas input for replay with: python -m src.replay FILE")
+    # Anything else is left for Qt
+    args, qt_args = parser.parse_known_args()
+
+    profiler = None
+    if args.profile_startup:
+        profiler = StartupProfiler()
+        profiler.mark("imports")
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    if profiler:
+        profiler.mark("QApplication")
+
     window = MainWindow()
+    if profiler:
+        profiler.mark("MainWindow")
+        profiler.watch_first_paint(window.canvas)
+
+    if args.record:
+        from src.replay import InputRecorder
+        recorder = InputRecorder(window.canvas, args.record)
+        app.aboutToQuit.connect(recorder.stop)
+
     window.show()
     sys.exit(app.exec())
@@ -1,31 +1,53 @@
 import json
-from PyQt6.QtCore import Qt, QPoint, QPointF, QRectF
+from array import array
+from PyQt6.QtCore import Qt, QPoint, QPointF, QRectF, pyqtSignal
 from PyQt6.QtGui import QPainter, QPen, QPainterPath, QTransform
 from PyQt6.QtWidgets import QWidget, QMessageBox
 
+from src.point_codec import encode_points, decode_points, points_to_text, points_from_text
+
 class DrawingCanvas(QWidget):
+    # Emitted with the method name and arguments before a UI action changes the
+    # canvas outside of input events, so recordings can replay it
+    action_performed = pyqtSignal(str, list)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Interactive Bezier Curve Editor")
         self.resize(800, 600)
         self.points = []
+        self.raw_points = None  # Quantized, delta-encoded copy of the points once fitted
+        self.raw_points_policy = 'quantized'  # 'drop', 'quantized' or 'full'
         self.sampled_points = []
         self.first_control_points = []
         self.second_control_points = []
         self.smoothed_path = None
+        self.imported_strokes = []  # (knots, first, second) flat coordinate arrays
+        self.imported_bounds = []  # Scene rect of each imported stroke
+        # Imported strokes are bucketed into a grid of scene cells, each with its
+        # own bounds and cached path, so painting and hit-testing only visit the
+        # cells in view and an edit only rebuilds the path of one cell
+        self.imported_cell_size = 256
+        self.imported_stroke_cells = []  # Cell key of each imported stroke
+        self.imported_cells = {}  # Cell key -> indices of the strokes in it
+        self.imported_cell_bounds = {}  # Cell key -> union of its stroke bounds
+        self.imported_cell_paths = {}  # Cell key -> cached path, missing when stale
+        self.imported_max_extent = 0.0  # Largest half width or height of an imported stroke
         self.mode = 1
         self.is_drawing = True
+        self.stroke_active = False  # Left button held while drawing a stroke
         self.selected_control_point_index = None
         self.selected_control_point_type = None
+        self.selected_stroke_index = None  # Imported stroke being adjusted, None for the drawn stroke
         self.scale_factor = 1.0  # For zooming
         self.pan_active = False  # Track whether panning is active
         self.last_pan_point = QPoint(0, 0)  # Last point where middle mouse button was pressed
         self.offset = QPoint(0, 0)  # Canvas offset for translation (panning)
         self.control_point_radius = 5
         self.sampling_interval = 10  # Adjust this value to change the frequency
-        self.show()
 
     def set_mode(self, m):
+        self.action_performed.emit('set_mode', [m])
         self.mode = m
 
         if (m == 2):
@@ -81,17 +103,23 @@ class DrawingCanvas(QWidget):
         if event.button() == Qt.MouseButton.LeftButton:
             if self.mode == 1:  # Drawing mode
                 self.points = []
+                self.raw_points = None
                 self.sampled_points = []
                 self.first_control_points = []
                 self.second_control_points = []
                 self.smoothed_path = None
                 self.points.append(pos)
+                self.stroke_active = True
                 self.update()
             elif self.mode == 2:  # Adjustment mode
-                cp_type, index = self.getControlPointAtPosition(pos)
+                cp_type, index, stroke_index = self.getControlPointAtPosition(pos)
                 if index is not None:
                     self.selected_control_point_type = cp_type
                     self.selected_control_point_index = index
+                    self.selected_stroke_index = stroke_index
+                    if stroke_index is not None:
+                        # Leave the stroke being adjusted out of its cell's cached path
+                        self.imported_cell_paths.pop(self.imported_stroke_cells[stroke_index], None)
         elif event.button() == Qt.MouseButton.MiddleButton:
             self.pan_active = True
             self.last_pan_point = event.pos()  # Start tracking the mouse position for panning
@@ -115,6 +143,13 @@ class DrawingCanvas(QWidget):
             if self.mode == 1:  # Drawing mode
                 self.points.append(pos)
                 self.update()
+            elif self.mode == 2 and self.selected_stroke_index is not None:
+                # Adjustment mode: move the selected control point of an imported stroke
+                knots, first, second = self.imported_strokes[self.selected_stroke_index]
+                control_points = first if self.selected_control_point_type == 'first' else second
+                control_points[2 * self.selected_control_point_index] = pos.x()
+                control_points[2 * self.selected_control_point_index + 1] = pos.y()
+                self.update()
             elif self.mode == 2 and self.selected_control_point_index is not None:
                 # Adjustment mode: move the selected control point
                 if self.selected_control_point_type == 'first':
@@ -128,20 +163,17 @@ class DrawingCanvas(QWidget):
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
-            if self.mode == 1:  # Drawing mode
-                # Down-sample the points
-                sampled_points = self.points[::self.sampling_interval]
-                # Ensure the last point is included
-                if self.points[-1] != sampled_points[-1]:
-                    sampled_points.append(self.points[-1])
-                self.sampled_points = sampled_points
-                # Compute control points using the sampled points
-                self.first_control_points, self.second_control_points = self.getCurveControlPoints(self.sampled_points)
-                self.smoothed_path = self.createBezierPathFromControlPoints(self.sampled_points, self.first_control_points, self.second_control_points)
+            if self.mode == 1 and self.points:  # Drawing mode
+                self.stroke_active = False
+                self.fitStroke(self.points)
+                self.retainRawPoints()
                 self.update()
             elif self.mode == 2 and self.selected_control_point_index is not None:
+                if self.selected_stroke_index is not None:
+                    self.updateImportedStroke(self.selected_stroke_index)
                 self.selected_control_point_index = None
                 self.selected_control_point_type = None
+                self.selected_stroke_index = None
         elif event.button() == Qt.MouseButton.MiddleButton:
             self.pan_active = False
 
@@ -162,21 +194,55 @@ class DrawingCanvas(QWidget):
         pen = QPen(Qt.GlobalColor.black, 2)
         painter.setPen(pen)
 
+        # Draw the cached paths of the imported cells in view
+        visible = self.getInverseTransform().mapRect(QRectF(self.rect()))
+        visible_cells = self.getImportedCellsIn(visible)
+        for key in visible_cells:
+            path = self.imported_cell_paths.get(key)
+            if path is None:
+                path = self.createPathFromImportedStrokes(
+                    self.imported_strokes[i] for i in self.imported_cells[key] if i != self.selected_stroke_index
+                )
+                self.imported_cell_paths[key] = path
+            painter.drawPath(path)
+        if self.selected_stroke_index is not None:
+            painter.drawPath(self.createPathFromImportedStrokes([self.imported_strokes[self.selected_stroke_index]]))
+
         if self.mode == 1:  # Drawing mode
             path = QPainterPath()
-            if self.points:
+            if self.stroke_active and self.points:
                 path.moveTo(self.points[0])
                 for point in self.points[1:]:
                     path.lineTo(point)
+            elif self.smoothed_path:
+                # Once fitted, show the curve whatever raw points were kept
+                path = self.smoothed_path
             painter.drawPath(path)
 
-        elif self.mode == 2 and self.smoothed_path:
-            painter.drawPath(self.smoothed_path)
+        elif self.mode == 2:
+            if self.smoothed_path:
+                painter.drawPath(self.smoothed_path)
 
             pen = QPen(Qt.GlobalColor.red, 1, Qt.PenStyle.DashLine)
             painter.setPen(pen)
             painter.setBrush(Qt.GlobalColor.white)
 
+            # Only imported strokes in view get handles
+            for key in visible_cells:
+                for stroke_index in self.imported_cells[key]:
+                    if not self.imported_bounds[stroke_index].intersects(visible):
+                        continue
+                    knots, first, second = self.imported_strokes[stroke_index]
+                    for i in range(0, len(first), 2):
+                        cp1 = QPointF(first[i], first[i + 1])
+                        cp2 = QPointF(second[i], second[i + 1])
+
+                        painter.drawLine(QPointF(knots[i], knots[i + 1]), cp1)
+                        painter.drawLine(QPointF(knots[i + 2], knots[i + 3]), cp2)
+
+                        painter.drawEllipse(cp1, self.control_point_radius, self.control_point_radius)
+                        painter.drawEllipse(cp2, self.control_point_radius, self.control_point_radius)
+
             for i in range(len(self.first_control_points)):
                 cp1 = self.first_control_points[i]
                 cp2 = self.second_control_points[i]
@@ -201,6 +267,62 @@ class DrawingCanvas(QWidget):
 
         painter.restore()
 
+    def fitStroke(self, points):
+        # Down-sample the points
+        sampled_points = points[::self.sampling_interval]
+        # Ensure the last point is included
+        if points[-1] != sampled_points[-1]:
+            sampled_points.append(points[-1])
+        self.sampled_points = sampled_points
+        # Compute control points using the sampled points
+        first_control_points, second_control_points = self.getCurveControlPoints(self.sampled_points)
+        # A single click has no segments to fit
+        self.first_control_points = first_control_points or []
+        self.second_control_points = second_control_points or []
+        self.smoothed_path = self.createBezierPathFromControlPoints(self.sampled_points, self.first_control_points, self.second_control_points)
+
+    def retainRawPoints(self):
+        # Painting only needs the knots and control points, so keep the raw
+        # input according to the retention policy
+        if self.raw_points_policy == 'quantized' and self.points:
+            self.raw_points = encode_points((p.x(), p.y()) for p in self.points)
+            self.points = []
+        elif self.raw_points_policy == 'drop':
+            self.raw_points = None
+            self.points = []
+
+    def getRawPoints(self):
+        if self.points:
+            return self.points
+        if self.raw_points:
+            return [QPointF(x, y) for x, y in decode_points(self.raw_points)]
+        return []
+
+    def set_raw_points_policy(self, policy):
+        self.action_performed.emit('set_raw_points_policy', [policy])
+        self.raw_points_policy = policy
+
+        # Apply the policy to the current stroke too, not only to later ones
+        if self.sampled_points:
+            if policy == 'full' and not self.points:
+                self.points = self.getRawPoints()
+                self.raw_points = None
+            else:
+                self.retainRawPoints()
+
+    def set_sampling_interval(self, interval):
+        self.action_performed.emit('set_sampling_interval', [interval])
+        self.sampling_interval = interval
+
+    def refitStroke(self):
+        self.action_performed.emit('refitStroke', [])
+        points = self.getRawPoints()
+        if not points:
+            return
+
+        self.fitStroke(points)
+        self.update()
+
     def createBezierPathFromControlPoints(self, points, first_control_points, second_control_points):
         if len(points) < 2:
             return None
@@ -216,6 +338,22 @@ class DrawingCanvas(QWidget):
 
         return path
 
+    def createPathFromImportedStrokes(self, strokes):
+        path = QPainterPath()
+
+        for knots, first, second in strokes:
+            path.moveTo(knots[0], knots[1])
+            for i in range(0, len(first), 2):
+                path.cubicTo(first[i], first[i + 1], second[i], second[i + 1], knots[i + 2], knots[i + 3])
+
+        return path
+
+    def getImportedStrokeBounds(self, stroke):
+        xs = [v for values in stroke for v in values[0::2]]
+        ys = [v for values in stroke for v in values[1::2]]
+        # Padded so straight horizontal or vertical strokes still intersect the view
+        return QRectF(QPointF(min(xs), min(ys)), QPointF(max(xs), max(ys))).adjusted(-1, -1, 1, 1)
+
     def getCurveControlPoints(self, knots):
         n = len(knots) - 1
         if n < 1:
@@ -279,24 +417,115 @@ class DrawingCanvas(QWidget):
         if self.first_control_points:
             for i, cp in enumerate(self.first_control_points):
                 if (cp - pos).manhattanLength() <= self.control_point_radius * 2:
-                    return ('first', i)
+                    return ('first', i, None)
             for i, cp in enumerate(self.second_control_points):
                 if (cp - pos).manhattanLength() <= self.control_point_radius * 2:
-                    return ('second', i)
-        return (None, None)
-
-    def saveToFile(self):
-        # Prepare data to be saved
-        data = {
+                    return ('second', i, None)
+
+        radius = self.control_point_radius * 2
+        for key in self.getImportedCellsIn(QRectF(pos.x() - radius, pos.y() - radius, 2 * radius, 2 * radius)):
+            for stroke_index in self.imported_cells[key]:
+                bounds = self.imported_bounds[stroke_index]
+                if not bounds.adjusted(-radius, -radius, radius, radius).contains(pos):
+                    continue
+                knots, first, second = self.imported_strokes[stroke_index]
+                for cp_type, control_points in (('first', first), ('second', second)):
+                    for i in range(0, len(control_points), 2):
+                        if abs(control_points[i] - pos.x()) + abs(control_points[i + 1] - pos.y()) <= radius:
+                            return (cp_type, i // 2, stroke_index)
+        return (None, None, None)
+
+    def getImportedCellKey(self, bounds):
+        center = bounds.center()
+        return (int(center.x() // self.imported_cell_size), int(center.y() // self.imported_cell_size))
+
+    def getImportedCellsIn(self, rect):
+        # Strokes are filed by their center, so widen the query by the largest
+        # stroke extent, then visit whichever is smaller: the grid keys under the
+        # rect or the occupied cells
+        size = self.imported_cell_size
+        extent = self.imported_max_extent
+        left = int((rect.left() - extent) // size)
+        right = int((rect.right() + extent) // size)
+        top = int((rect.top() - extent) // size)
+        bottom = int((rect.bottom() + extent) // size)
+        if (right - left + 1) * (bottom - top + 1) < len(self.imported_cell_bounds):
+            keys = ((cx, cy) for cx in range(left, right + 1) for cy in range(top, bottom + 1))
+            keys = [key for key in keys if key in self.imported_cell_bounds]
+        else:
+            keys = self.imported_cell_bounds
+        return [key for key in keys if self.imported_cell_bounds[key].intersects(rect)]
+
+    def updateImportedCell(self, key):
+        indices = self.imported_cells.get(key)
+        self.imported_cell_paths.pop(key, None)
+        if not indices:
+            self.imported_cells.pop(key, None)
+            self.imported_cell_bounds.pop(key, None)
+            return
+
+        bounds = QRectF(self.imported_bounds[indices[0]])
+        for i in indices[1:]:
+            bounds = bounds.united(self.imported_bounds[i])
+        self.imported_cell_bounds[key] = bounds
+
+    def addImportedStrokes(self, strokes):
+        changed = set()
+        for stroke in strokes:
+            bounds = self.getImportedStrokeBounds(stroke)
+            key = self.getImportedCellKey(bounds)
+            self.imported_max_extent = max(self.imported_max_extent, bounds.width() / 2, bounds.height() / 2)
+            self.imported_cells.setdefault(key, []).append(len(self.imported_strokes))
+            self.imported_strokes.append(stroke)
+            self.imported_bounds.append(bounds)
+            self.imported_stroke_cells.append(key)
+            changed.add(key)
+        for key in changed:
+            self.updateImportedCell(key)
+
+    def updateImportedStroke(self, stroke_index):
+        # Refresh bounds and cell membership after a stroke was edited
+        old_key = self.imported_stroke_cells[stroke_index]
+        bounds = self.getImportedStrokeBounds(self.imported_strokes[stroke_index])
+        key = self.getImportedCellKey(bounds)
+        self.imported_max_extent = max(self.imported_max_extent, bounds.width() / 2, bounds.height() / 2)
+        self.imported_bounds[stroke_index] = bounds
+        if key != old_key:
+            self.imported_cells[old_key].remove(stroke_index)
+            self.imported_cells.setdefault(key, []).append(stroke_index)
+            self.imported_stroke_cells[stroke_index] = key
+            self.updateImportedCell(old_key)
+        self.updateImportedCell(key)
+
+    def clearImportedStrokes(self):
+        self.imported_strokes = []
+        self.imported_bounds = []
+        self.imported_stroke_cells = []
+        self.imported_cells = {}
+        self.imported_cell_bounds = {}
+        self.imported_cell_paths = {}
+        self.imported_max_extent = 0.0
+
+    def documentData(self):
+        return {
             "points": [{"x": p.x(), "y": p.y()} for p in self.points],
+            "raw_points": points_to_text(self.raw_points) if self.raw_points else None,
             "sampled_points": [{"x": p.x(), "y": p.y()} for p in self.sampled_points],
             "first_control_points": [{"x": p.x(), "y": p.y()} for p in self.first_control_points],
             "second_control_points": [{"x": p.x(), "y": p.y()} for p in self.second_control_points],
+            "imported_strokes": [
+                {"knots": list(knots), "first_control_points": list(first), "second_control_points": list(second)}
+                for knots, first, second in self.imported_strokes
+            ],
             "scale_factor": self.scale_factor,
             "offset": {"x": self.offset.x(), "y": self.offset.y()},
             "is_drawing": self.is_drawing
         }
 
+    def saveToFile(self):
+        # Prepare data to be saved
+        data = self.documentData()
+
         try:
             with open("data.json", "w") as f:
                 json.dump(data, f, indent=4)
@@ -309,27 +538,67 @@ class DrawingCanvas(QWidget):
             with open("data.json", "r") as f:
                 data = json.load(f)
 
-            # Load points
-            self.points = [QPointF(p["x"], p["y"]) for p in data.get("points", [])]
-            self.sampled_points = [QPointF(p["x"], p["y"]) for p in data.get("sampled_points", [])]
-            self.first_control_points = [QPointF(p["x"], p["y"]) for p in data.get("first_control_points", [])]
-            self.second_control_points = [QPointF(p["x"], p["y"]) for p in data.get("second_control_points", [])]
-            self.scale_factor = data.get("scale_factor", 1.0)
-            offset_data = data.get("offset", {"x": 0, "y": 0})
-            self.offset = QPointF(offset_data.get("x", 0), offset_data.get("y", 0))
-            self.is_drawing = data.get("is_drawing", True)
-
-            # Recreate the smoothed path
-            if not self.is_drawing and self.sampled_points and self.first_control_points and self.second_control_points:
-                self.smoothed_path = self.createBezierPathFromControlPoints(
-                    self.sampled_points, self.first_control_points, self.second_control_points
-                )
-            else:
-                self.smoothed_path = None
-
-            self.update()
+            self.loadDocumentData(data)
             QMessageBox.information(self, "Load Successful", "Bezier curve data has been loaded from data.json.")
         except FileNotFoundError:
             QMessageBox.warning(self, "Load Failed", "data.json file not found.")
         except Exception as e:
             QMessageBox.critical(self, "Load Failed", f"An error occurred while loading:\n{e}")
+
+    def loadDocumentData(self, data):
+        self.action_performed.emit('loadDocumentData', [data])
+
+        # Load points
+        self.points = [QPointF(p["x"], p["y"]) for p in data.get("points", [])]
+        raw_points = data.get("raw_points")
+        self.raw_points = points_from_text(raw_points) if raw_points else None
+        self.sampled_points = [QPointF(p["x"], p["y"]) for p in data.get("sampled_points", [])]
+        self.first_control_points = [QPointF(p["x"], p["y"]) for p in data.get("first_control_points", [])]
+        self.second_control_points = [QPointF(p["x"], p["y"]) for p in data.get("second_control_points", [])]
+        self.clearImportedStrokes()
+        self.addImportedStrokes(
+            (array('d', s["knots"]), array('d', s["first_control_points"]), array('d', s["second_control_points"]))
+            for s in data.get("imported_strokes", [])
+        )
+        self.scale_factor = data.get("scale_factor", 1.0)
+        offset_data = data.get("offset", {"x": 0, "y": 0})
+        self.offset = QPointF(offset_data.get("x", 0), offset_data.get("y", 0))
+        self.is_drawing = data.get("is_drawing", True)
+
+        # Recreate the smoothed path
+        if self.sampled_points and self.first_control_points and self.second_control_points:
+            self.smoothed_path = self.createBezierPathFromControlPoints(
+                self.sampled_points, self.first_control_points, self.second_control_points
+            )
+        else:
+            self.smoothed_path = None
+
+        self.update()
+
+    def importFromSvg(self, file_name):
+        try:
+            strokes, stats = self.importSvgFile(file_name)
+        except Exception as e:
+            QMessageBox.critical(self, "Import Failed", f"An error occurred while importing:\n{e}")
+            return
+
+        approximated = stats.get("approximated", 0)
+        skipped = stats.get("skipped", 0)
+        if approximated or skipped:
+            QMessageBox.warning(
+                self, "Import Incomplete",
+                f"Imported {len(strokes)} strokes. {approximated} arc segments were replaced by straight lines "
+                f"and {skipped} unsupported path commands were skipped."
+            )
+
+    def importSvgFile(self, file_name):
+        from src.svg_import import iter_svg_strokes
+
+        # Parse fully before touching the document so a failed import leaves it unchanged
+        stats = {}
+        strokes = list(iter_svg_strokes(file_name, stats))
+
+        self.action_performed.emit('importSvgFile', [file_name])
+        self.addImportedStrokes(strokes)
+        self.update()
+        return strokes, stats
@@ -0,0 +1,64 @@
+import base64
+
+# Raw points are stored at 1/8 pixel precision
+QUANTIZE_SCALE = 8
+
+
+def zigzag(n):
+    return (n << 1) ^ (n >> 63)
+
+
+def unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+def encode_points(points, scale=QUANTIZE_SCALE):
+    # Quantize (x, y) pairs to a fixed grid and store the delta between
+    # consecutive points as zigzag varints, so slow strokes take about two
+    # bytes per point instead of two Python floats.
+    out = bytearray()
+    last_x = last_y = 0
+
+    for x, y in points:
+        qx = round(x * scale)
+        qy = round(y * scale)
+        for delta in (qx - last_x, qy - last_y):
+            value = zigzag(delta)
+            while value >= 0x80:
+                out.append((value & 0x7F) | 0x80)
+                value >>= 7
+            out.append(value)
+        last_x, last_y = qx, qy
+
+    return bytes(out)
+
+
+def decode_points(data, scale=QUANTIZE_SCALE):
+    points = []
+    values = []
+    value = shift = 0
+    x = y = 0
+
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(unzigzag(value))
+        value = shift = 0
+        if len(values) == 2:
+            x += values[0]
+            y += values[1]
+            points.append((x / scale, y / scale))
+            values = []
+
+    return points
+
+
+def points_to_text(data):
+    # Encoded buffers are written into data.json as base64
+    return base64.b64encode(data).decode("ascii")
+
+
+def points_from_text(text):
+    return base64.b64decode(text)
@@ -0,0 +1,200 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from PyQt6.QtCore import Qt, QEvent, QObject, QPoint, QPointF
+from PyQt6.QtGui import QMouseEvent, QWheelEvent
+
+# Event types captured from the canvas, by name as written to the recording
+MOUSE_EVENTS = {
+    QEvent.Type.MouseButtonPress: 'press',
+    QEvent.Type.MouseMove: 'move',
+    QEvent.Type.MouseButtonRelease: 'release',
+    QEvent.Type.MouseButtonDblClick: 'dblclick',
+}
+MOUSE_EVENT_TYPES = {name: event_type for event_type, name in MOUSE_EVENTS.items()}
+
+
+class InputRecorder(QObject):
+    # Event filter that writes timestamped canvas input events and canvas
+    # actions (mode switches, refits, loads, SVG imports, ...) to a file, one JSON object per line,
+    # preceded by a header with the canvas size and starting document state
+    def __init__(self, canvas, file_name):
+        super().__init__(canvas)
+        self.canvas = canvas
+        self.file = open(file_name, "w")
+        self.start_time = None
+        canvas.installEventFilter(self)
+        canvas.action_performed.connect(self.record_action)
+
+    def write_record(self, record):
+        if self.start_time is None:
+            # Write the header once the canvas has its laid out size, with the
+            # state as it is just before the first recorded event
+            self.start_time = time.perf_counter()
+            header = {
+                "version": 2,
+                "width": self.canvas.width(),
+                "height": self.canvas.height(),
+                "mode": self.canvas.mode,
+                "sampling_interval": self.canvas.sampling_interval,
+                "raw_points_policy": self.canvas.raw_points_policy,
+                "document": self.canvas.documentData(),
+            }
+            self.file.write(json.dumps(header) + "\n")
+        record["t"] = time.perf_counter() - self.start_time
+        self.file.write(json.dumps(record) + "\n")
+
+    def record_action(self, name, args):
+        if self.file is not None:
+            self.write_record({"type": 'action', "name": name, "args": args})
+
+    def eventFilter(self, obj, event):
+        if obj is self.canvas and self.file is not None:
+            record = None
+            if event.type() in MOUSE_EVENTS:
+                pos = event.position()
+                record = {
+                    "type": MOUSE_EVENTS[event.type()],
+                    "x": pos.x(),
+                    "y": pos.y(),
+                    "button": event.button().value,
+                    "buttons": event.buttons().value,
+                    "modifiers": event.modifiers().value,
+                }
+            elif event.type() == QEvent.Type.Wheel:
+                pos = event.position()
+                record = {
+                    "type": 'wheel',
+                    "x": pos.x(),
+                    "y": pos.y(),
+                    "angle_x": event.angleDelta().x(),
+                    "angle_y": event.angleDelta().y(),
+                    "buttons": event.buttons().value,
+                    "modifiers": event.modifiers().value,
+                }
+            if record is not None:
+                self.write_record(record)
+        return False
+
+    def stop(self):
+        if self.file is not None:
+            self.canvas.removeEventFilter(self)
+            self.canvas.action_performed.disconnect(self.record_action)
+            self.file.close()
+            self.file = None
+
+
+def load_recording(file_name):
+    with open(file_name, "r") as f:
+        line = f.readline()
+        header = json.loads(line) if line.strip() else {"version": 1, "width": 800, "height": 600}
+        events = [json.loads(line) for line in f if line.strip()]
+    return header, events
+
+
+def create_event(record):
+    pos = QPointF(record["x"], record["y"])
+    buttons = Qt.MouseButton(record["buttons"])
+    modifiers = Qt.KeyboardModifier(record["modifiers"])
+
+    if record["type"] == 'wheel':
+        angle = QPoint(record["angle_x"], record["angle_y"])
+        return QWheelEvent(pos, pos, QPoint(0, 0), angle, buttons, modifiers,
+                           Qt.ScrollPhase.NoScrollPhase, False)
+
+    return QMouseEvent(MOUSE_EVENT_TYPES[record["type"]], pos, pos,
+                       Qt.MouseButton(record["button"]), buttons, modifiers)
+
+
+def document_checksum(canvas):
+    data = json.dumps(canvas.documentData(), sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def restore_state(canvas, header):
+    canvas.resize(header["width"], header["height"])
+    if "document" in header:
+        canvas.loadDocumentData(header["document"])
+    canvas.mode = header.get("mode", canvas.mode)
+    canvas.sampling_interval = header.get("sampling_interval", canvas.sampling_interval)
+    canvas.raw_points_policy = header.get("raw_points_policy", canvas.raw_points_policy)
+
+
+def replay(app, canvas, file_name, realtime=False):
+    # Feed a recording back into the canvas, starting from the recorded state,
+    # and time how long each event takes to handle, including the repaint it schedules
+    header, events = load_recording(file_name)
+    restore_state(canvas, header)
+    app.processEvents()
+
+    timings = []
+    start_time = time.perf_counter()
+    for record in events:
+        if realtime:
+            delay = start_time + record["t"] - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        if record["type"] == 'action':
+            event_start = time.perf_counter()
+            getattr(canvas, record["name"])(*record["args"])
+        else:
+            event = create_event(record)
+            event_start = time.perf_counter()
+            app.sendEvent(canvas, event)
+        app.processEvents()
+        timings.append((record["type"], record["t"], time.perf_counter() - event_start))
+
+    return {
+        "events": len(events),
+        "elapsed": time.perf_counter() - start_time,
+        "timings": timings,
+        "checksum": document_checksum(canvas),
+    }
+
+
+def print_report(result):
+    by_type = {}
+    for event_type, t, duration in result["timings"]:
+        by_type.setdefault(event_type, []).append(duration)
+
+    print(f"Replayed {result['events']} events in {result['elapsed'] * 1000:.1f} ms")
+    print(f"{'event':<10}{'count':>8}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for event_type, durations in sorted(by_type.items()):
+        durations.sort()
+        mean = sum(durations) / len(durations)
+        p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+        print(f"{event_type:<10}{len(durations):>8}{mean * 1000:>10.3f}{p95 * 1000:>10.3f}{durations[-1] * 1000:>10.3f}")
+    print(f"Document checksum: {result['checksum']}")
+
+
+def write_timings(result, file_name):
+    # One JSON object per replayed event, in recording order
+    with open(file_name, "w") as f:
+        for index, (event_type, t, duration) in enumerate(result["timings"]):
+            f.write(json.dumps({"index": index, "type": event_type, "t": t, "ms": duration * 1000}) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded Ablevas session and report handling times.")
+    parser.add_argument("recording", help="file written by main.py --record")
+    parser.add_argument("--realtime", action="store_true", help="replay at the recorded speed instead of as fast as possible")
+    parser.add_argument("--timings", metavar="FILE", help="write per-event handling times to FILE as JSON lines")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt6.QtWidgets import QApplication
+    from src.canvas import DrawingCanvas
+
+    app = QApplication(sys.argv[:1])
+    canvas = DrawingCanvas()
+    canvas.show()
+    result = replay(app, canvas, args.recording, realtime=args.realtime)
+    print_report(result)
+    if args.timings:
+        write_timings(result, args.timings)
@@ -0,0 +1,185 @@
+import re
+from array import array
+from xml.etree.ElementTree import iterparse
+
+# Tokens in SVG path data: a command letter or a number
+PATH_TOKEN = re.compile(r"([A-Za-z])|([-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?)")
+
+# Arc flags are single characters and may be written without separators ("011")
+ARC_FLAG = re.compile(r"[\s,]*([01])")
+
+# Number of arguments consumed by each path command
+COMMAND_ARGS = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7, 'Z': 0}
+
+
+def iter_path_tokens(d, wants_flag=None):
+    # wants_flag is checked before each token; when it returns True the next
+    # token is read as a single arc flag character
+    pos = 0
+    while True:
+        if wants_flag is not None and wants_flag():
+            match = ARC_FLAG.match(d, pos)
+            if match:
+                pos = match.end()
+                yield float(match.group(1))
+                continue
+
+        match = PATH_TOKEN.search(d, pos)
+        if match is None:
+            return
+        pos = match.end()
+        command, number = match.groups()
+        if command:
+            yield command
+        else:
+            yield float(number)
+
+
+def iter_path_strokes(d, stats=None):
+    # Convert one SVG path "d" string into strokes. Each stroke is a tuple of
+    # flat array('d') buffers (knots, first control points, second control
+    # points) laid out as x0, y0, x1, y1, ... so no point objects are created.
+    # Arcs are approximated as a straight line to their end point and counted
+    # in stats["approximated"]; unknown commands and commands left without all
+    # of their arguments are counted in stats["skipped"].
+    if stats is None:
+        stats = {}
+    knots = first = second = None
+    x = y = 0.0
+    start_x = start_y = 0.0
+    # Control points of the previous segment, reflected by S and T
+    last_cubic = last_quad = None
+    command = None
+    args = []
+
+    def cubic_to(x1, y1, x2, y2, x3, y3):
+        first.extend((x1, y1))
+        second.extend((x2, y2))
+        knots.extend((x3, y3))
+
+    def line_to(x3, y3):
+        cubic_to(x + (x3 - x) / 3.0, y + (y3 - y) / 3.0,
+                 x + 2.0 * (x3 - x) / 3.0, y + 2.0 * (y3 - y) / 3.0,
+                 x3, y3)
+
+    def wants_flag():
+        return command in ('A', 'a') and len(args) in (3, 4)
+
+    for token in iter_path_tokens(d, wants_flag):
+        if isinstance(token, str):
+            if args:
+                # The previous command did not get all of its arguments
+                stats["skipped"] = stats.get("skipped", 0) + 1
+                args = []
+            if token.upper() not in COMMAND_ARGS:
+                # Ignore unknown commands and their arguments
+                stats["skipped"] = stats.get("skipped", 0) + 1
+                command = '?'
+                continue
+            command = token
+            args = []
+            if command not in 'Zz':
+                continue
+        elif command is None:
+            return
+        elif command == '?':
+            continue
+        else:
+            args.append(token)
+            if len(args) < COMMAND_ARGS[command.upper()]:
+                continue
+
+        relative = command.islower()
+        op = command.upper()
+        dx, dy = (x, y) if relative else (0.0, 0.0)
+        cubic = quad = None
+
+        if op == 'M':
+            if knots is not None and len(knots) > 2:
+                yield knots, first, second
+            x, y = args[0] + dx, args[1] + dy
+            start_x, start_y = x, y
+            knots, first, second = array('d', (x, y)), array('d'), array('d')
+            # Further coordinate pairs after a moveto are implicit linetos
+            command = 'l' if relative else 'L'
+        elif knots is None:
+            # Drawing commands are only valid after a moveto
+            return
+        elif op == 'Z':
+            if x != start_x or y != start_y:
+                line_to(start_x, start_y)
+            x, y = start_x, start_y
+            if len(knots) > 2:
+                yield knots, first, second
+            knots, first, second = array('d', (x, y)), array('d'), array('d')
+        elif op == 'L':
+            line_to(args[0] + dx, args[1] + dy)
+            x, y = args[0] + dx, args[1] + dy
+        elif op == 'H':
+            line_to(args[0] + dx, y)
+            x = args[0] + dx
+        elif op == 'V':
+            line_to(x, args[0] + dy)
+            y = args[0] + dy
+        elif op in 'CS':
+            if op == 'C':
+                x1, y1 = args[0] + dx, args[1] + dy
+                args = args[2:]
+            elif last_cubic is not None:
+                # Smooth curve: first control point mirrors the previous one
+                x1, y1 = 2.0 * x - last_cubic[0], 2.0 * y - last_cubic[1]
+            else:
+                x1, y1 = x, y
+            cubic = (args[0] + dx, args[1] + dy)
+            cubic_to(x1, y1, cubic[0], cubic[1], args[2] + dx, args[3] + dy)
+            x, y = args[2] + dx, args[3] + dy
+        elif op in 'QT':
+            if op == 'Q':
+                qx, qy = args[0] + dx, args[1] + dy
+                args = args[2:]
+            elif last_quad is not None:
+                qx, qy = 2.0 * x - last_quad[0], 2.0 * y - last_quad[1]
+            else:
+                qx, qy = x, y
+            quad = (qx, qy)
+            ex, ey = args[0] + dx, args[1] + dy
+            # Elevate the quadratic segment to an equivalent cubic
+            cubic_to(x + 2.0 * (qx - x) / 3.0, y + 2.0 * (qy - y) / 3.0,
+                     ex + 2.0 * (qx - ex) / 3.0, ey + 2.0 * (qy - ey) / 3.0,
+                     ex, ey)
+            x, y = ex, ey
+        elif op == 'A':
+            stats["approximated"] = stats.get("approximated", 0) + 1
+            line_to(args[5] + dx, args[6] + dy)
+            x, y = args[5] + dx, args[6] + dy
+
+        last_cubic, last_quad = cubic, quad
+        args = []
+
+    if args:
+        stats["skipped"] = stats.get("skipped", 0) + 1
+
+    if knots is not None and len(knots) > 2:
+        yield knots, first, second
+
+
+def iter_svg_strokes(file_name, stats=None):
+    # Stream <path> elements out of an SVG file without building the document
+    # tree, so very large files are never held in memory all at once.
+    open_elements = []
+    for event, elem in iterparse(file_name, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            continue
+
+        open_elements.pop()
+        if elem.tag.rsplit('}', 1)[-1] == 'path':
+            d = elem.get('d')
+            if d:
+                yield from iter_path_strokes(d, stats)
+
+        # Detach finished elements from their still open parent (a <g> layer
+        # or the root) so memory use stays flat however deeply paths are nested
+        elem.clear()
+        if open_elements:
+            open_elements[-1].remove(elem)
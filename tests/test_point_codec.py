@@ -0,0 +1,32 @@
+import pytest
+
+from src.point_codec import (
+    QUANTIZE_SCALE, decode_points, encode_points, points_from_text, points_to_text,
+)
+
+
+def test_round_trip_on_the_quantize_grid():
+    points = [(0.0, 0.0), (1.5, -2.25), (-1000.125, 4096.0), (1e6, -1e6)]
+    assert decode_points(encode_points(points)) == points
+
+
+def test_round_trip_error_is_within_half_a_step():
+    points = [(i * 0.37, -i * 1.91) for i in range(200)]
+    for (x, y), (dx, dy) in zip(points, decode_points(encode_points(points))):
+        assert abs(x - dx) <= 0.5 / QUANTIZE_SCALE
+        assert abs(y - dy) <= 0.5 / QUANTIZE_SCALE
+
+
+def test_small_deltas_take_one_byte_per_coordinate():
+    points = [(i, i) for i in range(100)]
+    assert len(encode_points(points)) == 200
+
+
+@pytest.mark.parametrize("points", [[], [(3.0, 4.0)]])
+def test_empty_and_single_point(points):
+    assert decode_points(encode_points(points)) == points
+
+
+def test_text_round_trip():
+    data = encode_points([(1.0, 2.0), (3.0, 4.0)])
+    assert points_from_text(points_to_text(data)) == data
@@ -0,0 +1,71 @@
+import pytest
+
+from src.svg_import import iter_path_strokes, iter_svg_strokes
+
+
+def strokes(d, stats=None):
+    return [tuple(list(values) for values in stroke) for stroke in iter_path_strokes(d, stats)]
+
+
+def test_line_becomes_cubic_on_the_line():
+    assert strokes("M0 0 L3 6") == [([0.0, 0.0, 3.0, 6.0], [1.0, 2.0], [2.0, 4.0])]
+
+
+def test_relative_commands_match_absolute():
+    assert strokes("m1 1 l2 0 h1 v2 c1 0 2 1 2 2 q0 1 1 1") == \
+        strokes("M1 1 L3 1 H4 V3 C5 3 6 4 6 5 Q6 6 7 6")
+
+
+def test_quadratic_is_elevated():
+    knots, first, second = strokes("M0 0 Q3 3 6 0")[0]
+    assert knots == [0.0, 0.0, 6.0, 0.0]
+    assert first == [2.0, 2.0]
+    assert second == [4.0, 2.0]
+
+
+def test_smooth_curves_reflect_previous_control_point():
+    knots, first, second = strokes("M0 0 C1 1 2 1 3 0 S5 -1 6 0")[0]
+    assert first[2:] == [4.0, -1.0]
+
+
+def test_close_path_returns_to_start_and_splits_subpaths():
+    result = strokes("M0 0 L3 0 L3 3 Z M10 10 L11 11")
+    assert len(result) == 2
+    assert result[0][0][-2:] == [0.0, 0.0]
+    assert result[1][0] == [10.0, 10.0, 11.0, 11.0]
+
+
+def test_implicit_lineto_after_moveto():
+    assert strokes("M0 0 3 0 3 3")[0][0] == [0.0, 0.0, 3.0, 0.0, 3.0, 3.0]
+
+
+def test_arc_flags_without_separators():
+    stats = {}
+    knots, first, second = strokes("M0 0 a5 5 0 0110 10 L20 20", stats)[0]
+    assert knots == [0.0, 0.0, 10.0, 10.0, 20.0, 20.0]
+    assert stats == {"approximated": 1}
+
+
+def test_unknown_and_incomplete_commands_are_counted():
+    stats = {}
+    result = strokes("M0 0 B1 2 L3 L4 4", stats)
+    assert result[0][0] == [0.0, 0.0, 4.0, 4.0]
+    assert stats == {"skipped": 2}
+
+
+def test_svg_file_with_nested_groups(tmp_path):
+    svg = tmp_path / "art.svg"
+    svg.write_text(
+        '<svg xmlns="http://www.w3.org/2000/svg"><g><g>'
+        '<path d="M0 0 L1 1"/><path d="M2 2 L3 3"/>'
+        '</g></g><path d="M4 4 L5 5"/></svg>'
+    )
+    knots = [list(stroke[0]) for stroke in iter_svg_strokes(str(svg))]
+    assert knots == [[0.0, 0.0, 1.0, 1.0], [2.0, 2.0, 3.0, 3.0], [4.0, 4.0, 5.0, 5.0]]
+
+
+def test_truncated_svg_raises(tmp_path):
+    svg = tmp_path / "broken.svg"
+    svg.write_text('<svg xmlns="http://www.w3.org/2000/svg"><path d="M0 0 L1 1"/><g>')
+    with pytest.raises(Exception):
+        list(iter_svg_strokes(str(svg)))